@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file, abort
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from werkzeug.utils import secure_filename
@@ -6,10 +6,13 @@ import pandas as pd
 import numpy as np
 import pickle
 import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
 import matplotlib.pyplot as plt
 import seaborn as sns
 import io
@@ -23,13 +26,18 @@ app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///employee_retention.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+app.config['EXPORT_FOLDER'] = os.environ.get('EXPORT_FOLDER') or 'exports'
+app.config['EXPORT_CHUNK_SIZE'] = 50000  # rows read and written per batch
+app.config['EXPORT_WORKERS'] = 2  # exports running at once; the rest wait in the queue
 
-# Ensure upload folder exists
+# Ensure upload and export folders exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+os.makedirs(app.config['EXPORT_FOLDER'], exist_ok=True)
 os.makedirs('data', exist_ok=True)
 
 db = SQLAlchemy(app)
 bcrypt = Bcrypt(app)
+export_executor = ThreadPoolExecutor(max_workers=app.config['EXPORT_WORKERS'])
 
 # Database Models
 class User(db.Model):
@@ -46,6 +54,35 @@ class MLModel(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
 
+class ModelEvaluation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    model_id = db.Column(db.Integer, db.ForeignKey('ml_model.id'), nullable=False)
+    dataset_version = db.Column(db.String(64), nullable=False)
+    metrics = db.Column(db.Text, nullable=False)  # JSON encoded metrics
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    __table_args__ = (db.UniqueConstraint('model_id', 'dataset_version'),)
+
+class ExportJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    export_type = db.Column(db.String(40), nullable=False)  # department_report / scored_employees
+    file_format = db.Column(db.String(10), nullable=False)  # csv / parquet
+    status = db.Column(db.String(20), default='pending')  # pending / running / completed / failed
+    file_path = db.Column(db.String(255))
+    rows_written = db.Column(db.Integer, default=0)
+    dataset_version = db.Column(db.String(64))  # dataset hash the export was built from
+    model_id = db.Column(db.Integer, db.ForeignKey('ml_model.id'))  # model version used for scoring
+    error = db.Column(db.Text)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    finished_at = db.Column(db.DateTime)
+
+# Feature columns shared by training, prediction and evaluation
+NUMERIC_FEATURES = [
+    'satisfaction_level', 'last_evaluation', 'number_project',
+    'average_montly_hours', 'time_spend_company', 'Work_accident',
+    'promotion_last_5years'
+]
+
 # Helper Functions
 def create_visualization(df, viz_type):
     """Create visualizations for data analysis"""
@@ -77,7 +114,8 @@ def create_visualization(df, viz_type):
 def preprocess_data(df):
     """Preprocess the employee data for ML model"""
     # Handle missing values
-    df = df.fillna(df.mean(numeric_only=True))
+    fill_values = df.mean(numeric_only=True)
+    df = df.fillna(fill_values)
     
     # Encode categorical variables
     le_dept = LabelEncoder()
@@ -87,16 +125,338 @@ def preprocess_data(df):
     df['salary_encoded'] = le_salary.fit_transform(df['salary'])
     
     # Select features for model
-    feature_columns = [
-        'satisfaction_level', 'last_evaluation', 'number_project',
-        'average_montly_hours', 'time_spend_company', 'Work_accident',
-        'promotion_last_5years', 'Department_encoded', 'salary_encoded'
-    ]
+    feature_columns = NUMERIC_FEATURES + ['Department_encoded', 'salary_encoded']
     
     X = df[feature_columns]
     y = df['left']
     
-    return X, y, le_dept, le_salary
+    return X, y, le_dept, le_salary, fill_values
+
+def dataset_version(path):
+    """Return a short content hash identifying a dataset file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def holdout_split(y):
+    """Row positions of the stratified train/test split used for training.
+
+    The split depends only on the labels, so evaluation can rebuild exactly
+    the rows a model trained on this dataset never saw.
+    """
+    return train_test_split(np.arange(len(y)), test_size=0.2, random_state=42, stratify=y)
+
+def model_artifact_path(user_id, model_id):
+    """Path of the immutable artifact for one model version"""
+    return os.path.join('models', f'employee_retention_model_{user_id}_v{model_id}.pkl')
+
+def save_model_artifact(path, model_data):
+    """Write a model artifact to a temporary file next to its final path"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        pickle.dump(model_data, f)
+    return temp_path
+
+def load_model_artifact(user_id, ml_model=None, fallback=True):
+    """Load a stored model version, optionally falling back to the legacy per-user file"""
+    if ml_model is not None:
+        path = model_artifact_path(user_id, ml_model.id)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+    if not fallback:
+        return None
+    legacy_path = f'models/employee_retention_model_{user_id}.pkl'
+    if os.path.exists(legacy_path):
+        with open(legacy_path, 'rb') as f:
+            return pickle.load(f)
+    return None
+
+def encode_labels(encoder, values):
+    """Vectorized LabelEncoder.transform that flags unseen labels instead of raising"""
+    classes = np.asarray(encoder.classes_).astype(str)
+    idx = np.searchsorted(classes, values)
+    idx = np.clip(idx, 0, len(classes) - 1)
+    known = classes[idx] == values
+    return idx, known
+
+def build_features(df, model_data, fill_values=None):
+    """Encode a frame with a model's encoders.
+
+    Missing values are filled with the training means stored in the model,
+    or with ``fill_values`` for older pickles that predate them. Returns the
+    feature matrix for rows whose categories the model knows, plus the
+    boolean mask of those rows.
+    """
+    if fill_values is None:
+        fill_values = model_data['fill_values']
+    df = df.fillna(fill_values)
+    dept_idx, dept_known = encode_labels(model_data['le_dept'], df['sales'].to_numpy(dtype=object).astype(str))
+    salary_idx, salary_known = encode_labels(model_data['le_salary'], df['salary'].to_numpy(dtype=object).astype(str))
+    mask = dept_known & salary_known
+    X = np.column_stack([df[NUMERIC_FEATURES].to_numpy(dtype=float), dept_idx, salary_idx])[mask]
+    return X, mask
+
+def predict_leave_probability(model_data, X):
+    """Scale a feature matrix and return the probability of leaving"""
+    if len(X) == 0:
+        return np.empty(0)
+    return model_data['model'].predict_proba(model_data['scaler'].transform(X))[:, 1]
+
+def evaluate_models(model_versions, df, version):
+    """Score several stored models against one dataset in a single pass.
+
+    Every model is scored on the same held-out split of the dataset, so a
+    model trained on this dataset version is never graded on its training
+    rows. The feature matrix is built once per distinct encoder vocabulary,
+    so adding a model only costs its own scaling and inference.
+    """
+    dataset_means = df.mean(numeric_only=True)
+    y = df['left'].fillna(dataset_means['left']).to_numpy(dtype=int)
+    try:
+        _, rows = holdout_split(y)
+        holdout = True
+    except ValueError:
+        # Too few rows of a class to stratify; fall back to the full dataset
+        rows = np.arange(len(df))
+        holdout = False
+    df = df.iloc[rows]
+    y = y[rows]
+
+    encoded_cache = {}
+    results = {}
+    for model_id, model_data in model_versions:
+        fill_values = model_data.get('fill_values', dataset_means)
+        key = (tuple(model_data['le_dept'].classes_), tuple(model_data['le_salary'].classes_),
+               tuple(fill_values.reindex(NUMERIC_FEATURES).tolist()))
+        if key not in encoded_cache:
+            X, mask = build_features(df, model_data, fill_values)
+            encoded_cache[key] = (X, y[mask], int((~mask).sum()))
+        X, y_true, skipped = encoded_cache[key]
+
+        proba = predict_leave_probability(model_data, X)
+        y_pred = (proba >= 0.5).astype(int)
+
+        report = classification_report(y_true, y_pred, labels=[0, 1],
+                                       output_dict=True, zero_division=0)
+        roc_auc = roc_auc_score(y_true, proba) if len(np.unique(y_true)) == 2 else None
+        results[model_id] = {
+            'accuracy': accuracy_score(y_true, y_pred),
+            'roc_auc': roc_auc,
+            'precision': report['1']['precision'],
+            'recall': report['1']['recall'],
+            'f1': report['1']['f1-score'],
+            'confusion_matrix': confusion_matrix(y_true, y_pred, labels=[0, 1]).tolist(),
+            'rows_scored': int(len(y_true)),
+            'rows_skipped': skipped,
+            'holdout': holdout,
+            # Its training rows may overlap this held-out split
+            'other_dataset': model_data.get('dataset_version') != version
+        }
+    return results
+
+def get_model_evaluations(models, user_id, data_path):
+    """Return cached metrics per model for a dataset, evaluating any misses together"""
+    version = dataset_version(data_path)
+    cached = ModelEvaluation.query.filter(
+        ModelEvaluation.dataset_version == version,
+        ModelEvaluation.model_id.in_([m.id for m in models])
+    ).all()
+    cached_rows = {e.model_id: e for e in cached}
+    evaluations = {}
+    for e in cached:
+        metrics = json.loads(e.metrics)
+        # Recompute entries cached before the dataset flag existed
+        if 'other_dataset' in metrics:
+            evaluations[e.model_id] = metrics
+
+    pending = []
+    for ml_model in models:
+        if ml_model.id in evaluations:
+            continue
+        # Models trained before versioning share one overwritten file, so skip them
+        model_data = load_model_artifact(user_id, ml_model, fallback=False)
+        if model_data is not None:
+            pending.append((ml_model.id, model_data))
+
+    if pending:
+        df = pd.read_csv(data_path)
+        for model_id, metrics in evaluate_models(pending, df, version).items():
+            evaluations[model_id] = metrics
+            if model_id in cached_rows:
+                cached_rows[model_id].metrics = json.dumps(metrics)
+            else:
+                db.session.add(ModelEvaluation(
+                    model_id=model_id,
+                    dataset_version=version,
+                    metrics=json.dumps(metrics)
+                ))
+        db.session.commit()
+
+    return version, evaluations
+
+def score_frame(df, model_data):
+    """Return leave probabilities for a frame, NaN where a category is unseen"""
+    X, mask = build_features(df, model_data)
+    proba = np.full(len(df), np.nan)
+    proba[mask] = predict_leave_probability(model_data, X)
+    return proba
+
+class ExportWriter:
+    """Append DataFrame batches to a CSV or Parquet file"""
+
+    def __init__(self, path, file_format):
+        self.path = path
+        self.file_format = file_format
+        self._parquet_writer = None
+        self._header_written = False
+
+    def write(self, df):
+        if self.file_format == 'parquet':
+            # pyarrow is only needed for Parquet exports
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            schema = self._parquet_writer.schema if self._parquet_writer is not None else None
+            table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='a' if self._header_written else 'w',
+                      header=not self._header_written, index=False)
+            self._header_written = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+def dataset_means(data_path):
+    """Numeric column means of a dataset, computed chunk by chunk"""
+    sums = None
+    counts = None
+    for chunk in pd.read_csv(data_path, chunksize=app.config['EXPORT_CHUNK_SIZE']):
+        numeric = chunk.select_dtypes(include='number')
+        sums = numeric.sum() if sums is None else sums.add(numeric.sum(), fill_value=0)
+        counts = numeric.count() if counts is None else counts.add(numeric.count(), fill_value=0)
+    return sums / counts
+
+def export_scored_employees(reader, writer, model_data):
+    """Stream every employee row with its predicted leave probability"""
+    rows = 0
+    for chunk in reader:
+        chunk['leave_probability'] = score_frame(chunk, model_data)
+        chunk['prediction'] = np.where(chunk['leave_probability'] >= 0.5, 'Likely to Leave', 'Likely to Stay')
+        chunk.loc[chunk['leave_probability'].isna(), 'prediction'] = 'Unknown'
+        writer.write(chunk)
+        rows += len(chunk)
+    return rows
+
+def export_department_report(reader, writer, model_data):
+    """Aggregate attrition and predicted risk per department across all chunks"""
+    partials = []
+    for chunk in reader:
+        if model_data is not None:
+            chunk['leave_probability'] = score_frame(chunk, model_data)
+        else:
+            chunk['leave_probability'] = np.nan
+        chunk['high_risk'] = (chunk['leave_probability'] >= 0.5).astype(int)
+        partials.append(chunk.groupby('sales').agg(
+            employees=('left', 'size'),
+            left=('left', 'sum'),
+            satisfaction_sum=('satisfaction_level', 'sum'),
+            satisfaction_count=('satisfaction_level', 'count'),
+            probability_sum=('leave_probability', 'sum'),
+            scored=('leave_probability', 'count'),
+            high_risk=('high_risk', 'sum')
+        ))
+
+    totals = pd.concat(partials).groupby(level=0).sum()
+    report = pd.DataFrame({
+        'department': totals.index,
+        'employees': totals['employees'].to_numpy(),
+        'left': totals['left'].to_numpy(),
+        'attrition_rate': (totals['left'] / totals['employees']).round(4).to_numpy(),
+        'avg_satisfaction': (totals['satisfaction_sum'] / totals['satisfaction_count'].replace(0, np.nan)).round(4).to_numpy(),
+        'avg_leave_probability': (totals['probability_sum'] / totals['scored'].replace(0, np.nan)).round(4).to_numpy(),
+        'high_risk_employees': totals['high_risk'].to_numpy()
+    }).sort_values('attrition_rate', ascending=False)
+    writer.write(report)
+    return len(report)
+
+def run_export(job_id, data_path):
+    """Background worker that builds an export file batch by batch"""
+    with app.app_context():
+        partial_path = None
+        writer = None
+        try:
+            job = db.session.get(ExportJob, job_id)
+            job.status = 'running'
+            job.dataset_version = dataset_version(data_path)
+
+            latest_model = MLModel.query.filter_by(created_by=job.created_by) \
+                .order_by(MLModel.id.desc()).first()
+            model_data = load_model_artifact(job.created_by, latest_model, fallback=False)
+            if model_data is not None:
+                job.model_id = latest_model.id
+            else:
+                # The legacy per-user file has no version to record
+                model_data = load_model_artifact(job.created_by)
+            if model_data is not None and 'fill_values' not in model_data:
+                # Older pickles lack training means; use whole-dataset means so
+                # scores do not depend on which chunk a row lands in
+                model_data['fill_values'] = dataset_means(data_path)
+            db.session.commit()
+
+            # Write to a partial file so downloads never see an incomplete export
+            partial_path = job.file_path + '.part'
+            writer = ExportWriter(partial_path, job.file_format)
+            reader = pd.read_csv(data_path, chunksize=app.config['EXPORT_CHUNK_SIZE'])
+
+            if job.export_type == 'scored_employees':
+                if model_data is None:
+                    raise ValueError('No trained model found. Please train a model first.')
+                rows = export_scored_employees(reader, writer, model_data)
+            else:
+                rows = export_department_report(reader, writer, model_data)
+            writer.close()
+
+            # An upload during the export would mix two datasets in one file
+            if dataset_version(data_path) != job.dataset_version:
+                raise ValueError('The dataset changed while the export was running. Please start the export again.')
+            os.replace(partial_path, job.file_path)
+
+            job.rows_written = rows
+            job.status = 'completed'
+        except Exception as e:
+            db.session.rollback()
+            if writer is not None:
+                writer.close()
+            if partial_path and os.path.exists(partial_path):
+                os.remove(partial_path)
+            job = db.session.get(ExportJob, job_id)
+            if job is None:
+                return
+            job.status = 'failed'
+            job.error = str(e)
+        job.finished_at = db.func.current_timestamp()
+        db.session.commit()
+
+def recover_interrupted_exports():
+    """Fail exports left unfinished by a previous process and remove their partial files"""
+    interrupted = ExportJob.query.filter(ExportJob.status.in_(['pending', 'running'])).all()
+    for job in interrupted:
+        job.status = 'failed'
+        job.error = 'Export was interrupted by a server restart. Please start it again.'
+        job.finished_at = db.func.current_timestamp()
+    db.session.commit()
+
+    for filename in os.listdir(app.config['EXPORT_FOLDER']):
+        if filename.endswith('.part'):
+            os.remove(os.path.join(app.config['EXPORT_FOLDER'], filename))
 
 # Routes
 @app.route('/')
@@ -212,15 +572,17 @@ def train_model():
                 flash('Dataset not found. Please upload data first.')
                 return redirect(url_for('train_model'))
             
+            # Hash before reading so the version matches the rows trained on
+            version = dataset_version(data_path)
             df = pd.read_csv(data_path)
             
             # Preprocess data
-            X, y, le_dept, le_salary = preprocess_data(df)
+            X, y, le_dept, le_salary, fill_values = preprocess_data(df)
             
             # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
-            )
+            train_rows, test_rows = holdout_split(y.to_numpy())
+            X_train, X_test = X.iloc[train_rows], X.iloc[test_rows]
+            y_train, y_test = y.iloc[train_rows], y.iloc[test_rows]
             
             # Scale features
             scaler = StandardScaler()
@@ -245,22 +607,42 @@ def train_model():
                 'model': model,
                 'scaler': scaler,
                 'le_dept': le_dept,
-                'le_salary': le_salary
+                'le_salary': le_salary,
+                'fill_values': fill_values,
+                'dataset_version': version
             }
             
-            os.makedirs('models', exist_ok=True)
-            model_filename = f'models/employee_retention_model_{session["user_id"]}.pkl'
-            with open(model_filename, 'wb') as f:
-                pickle.dump(model_data, f)
-            
-            # Save model info to database
+            # Register the version first so its id names the artifact
             ml_model = MLModel(
                 model_name=f'RandomForest_Model_{session["user_id"]}',
                 accuracy=accuracy,
                 created_by=session['user_id']
             )
             db.session.add(ml_model)
-            db.session.commit()
+            db.session.flush()
+            ml_model.model_name = f'RandomForest_Model_{session["user_id"]}_v{ml_model.id}'
+            
+            # Cache the comparison metrics now so the comparison view never scores inline
+            metrics = evaluate_models([(ml_model.id, model_data)], df, version)[ml_model.id]
+            db.session.add(ModelEvaluation(
+                model_id=ml_model.id,
+                dataset_version=version,
+                metrics=json.dumps(metrics)
+            ))
+            
+            # The artifact only takes its final name once its row is committed,
+            # so a failed commit never leaves a file that blocks a reused id
+            artifact_path = model_artifact_path(session['user_id'], ml_model.id)
+            temp_path = None
+            try:
+                temp_path = save_model_artifact(artifact_path, model_data)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                if temp_path and os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            os.replace(temp_path, artifact_path)
             
             flash(f'Model trained successfully! Accuracy: {accuracy:.2%}')
             return redirect(url_for('dashboard'))
@@ -271,6 +653,37 @@ def train_model():
     
     return render_template('train_model.html')
 
+@app.route('/compare_models')
+def compare_models():
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    data_path = 'data/HR_comma_sep.csv'
+    if not os.path.exists(data_path):
+        flash('Dataset not found. Please upload data first.')
+        return redirect(url_for('upload_data'))
+    
+    user_models = MLModel.query.filter_by(created_by=session['user_id']) \
+        .order_by(MLModel.id.desc()).all()
+    
+    try:
+        version, evaluations = get_model_evaluations(user_models, session['user_id'], data_path)
+    except Exception as e:
+        flash(f'Error evaluating models: {str(e)}')
+        return redirect(url_for('dashboard'))
+    
+    rows = [(m, evaluations[m.id]) for m in user_models if m.id in evaluations]
+    champion_id = None
+    scored = [(m, e) for m, e in rows if e['roc_auc'] is not None]
+    if scored:
+        champion_id = max(scored, key=lambda r: r[1]['roc_auc'])[0].id
+    
+    return render_template('compare_models.html',
+                         rows=rows,
+                         dataset_version=version,
+                         champion_id=champion_id,
+                         missing=len(user_models) - len(rows))
+
 @app.route('/predict', methods=['GET', 'POST'])
 def predict():
     if 'user_id' not in session:
@@ -278,15 +691,14 @@ def predict():
     
     if request.method == 'POST':
         try:
-            # Load model
-            model_filename = f'models/employee_retention_model_{session["user_id"]}.pkl'
-            if not os.path.exists(model_filename):
+            # Load the latest model version
+            latest_model = MLModel.query.filter_by(created_by=session['user_id']) \
+                .order_by(MLModel.id.desc()).first()
+            model_data = load_model_artifact(session['user_id'], latest_model)
+            if model_data is None:
                 flash('No trained model found. Please train a model first.')
                 return redirect(url_for('train_model'))
             
-            with open(model_filename, 'rb') as f:
-                model_data = pickle.load(f)
-            
             model = model_data['model']
             scaler = model_data['scaler']
             le_dept = model_data['le_dept']
@@ -433,7 +845,81 @@ def simple_upload():
     
     return render_template('simple_upload.html')
 
+@app.route('/exports', methods=['GET', 'POST'])
+def exports():
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    if request.method == 'POST':
+        export_type = request.form.get('export_type')
+        file_format = request.form.get('file_format', 'csv')
+        if export_type not in ('department_report', 'scored_employees') or file_format not in ('csv', 'parquet'):
+            flash('Invalid export options.', 'error')
+            return redirect(url_for('exports'))
+        
+        data_path = 'data/HR_comma_sep.csv'
+        if not os.path.exists(data_path):
+            flash('Dataset not found. Please upload data first.', 'error')
+            return redirect(url_for('upload_data'))
+        
+        active_job = ExportJob.query.filter_by(created_by=session['user_id'], export_type=export_type,
+                                            file_format=file_format) \
+            .filter(ExportJob.status.in_(['pending', 'running'])).first()
+        if active_job:
+            flash('An export of this type and format is already in progress. Please wait for it to finish.', 'warning')
+            return redirect(url_for('exports'))
+        
+        job = ExportJob(export_type=export_type, file_format=file_format,
+                        created_by=session['user_id'])
+        db.session.add(job)
+        db.session.flush()
+        job.file_path = os.path.join(app.config['EXPORT_FOLDER'],
+                                     f'{export_type}_{session["user_id"]}_{job.id}.{file_format}')
+        db.session.commit()
+        
+        export_executor.submit(run_export, job.id, data_path)
+        
+        flash('Export started. It will be available for download once completed.', 'success')
+        return redirect(url_for('exports'))
+    
+    jobs = ExportJob.query.filter_by(created_by=session['user_id']) \
+        .order_by(ExportJob.id.desc()).all()
+    return render_template('exports.html', jobs=jobs)
+
+@app.route('/exports/<int:job_id>/status')
+def export_status(job_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    
+    job = ExportJob.query.filter_by(id=job_id, created_by=session['user_id']).first_or_404()
+    return jsonify({
+        'id': job.id,
+        'status': job.status,
+        'rows_written': job.rows_written,
+        'dataset_version': job.dataset_version,
+        'model_id': job.model_id,
+        'error': job.error
+    })
+
+@app.route('/exports/<int:job_id>/download')
+def download_export(job_id):
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    job = ExportJob.query.filter_by(id=job_id, created_by=session['user_id']).first_or_404()
+    if job.status != 'completed' or not os.path.exists(job.file_path):
+        abort(404)
+    
+    # send_file streams from disk and answers Range requests via conditional responses
+    mimetype = 'text/csv' if job.file_format == 'csv' else 'application/vnd.apache.parquet'
+    return send_file(os.path.abspath(job.file_path),
+                     mimetype=mimetype,
+                     as_attachment=True,
+                     download_name=os.path.basename(job.file_path),
+                     conditional=True)
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        recover_interrupted_exports()
     app.run(debug=True)
@@ -25,6 +25,11 @@ class Config:
     # Model configuration
     MODEL_FOLDER = os.environ.get('MODEL_FOLDER') or 'models'
     
+    # Export configuration
+    EXPORT_FOLDER = os.environ.get('EXPORT_FOLDER') or 'exports'
+    EXPORT_CHUNK_SIZE = 50000  # rows read and written per batch
+    EXPORT_WORKERS = 2  # exports running at once; the rest wait in the queue
+    
     # Development settings
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     TESTING = False
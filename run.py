@@ -42,7 +42,7 @@ def install_dependencies():
 
 def create_directories():
     """Create necessary directories"""
-    directories = ['models', 'uploads', 'instance']
+    directories = ['models', 'uploads', 'exports', 'instance']
     for directory in directories:
         Path(directory).mkdir(exist_ok=True)
         print(f"✅ Created directory: {directory}")
@@ -51,9 +51,10 @@ def initialize_database():
     """Initialize the database"""
     print("🗄️  Initializing database...")
     try:
-        from app import app, db
+        from app import app, db, recover_interrupted_exports
         with app.app_context():
             db.create_all()
+            recover_interrupted_exports()
         print("✅ Database initialized successfully")
         return True
     except Exception as e: